@@ -5,6 +5,9 @@ const path = require('path');
 const NodeCache = require('node-cache');
 const cache = new NodeCache({ stdTTL: 3600 }); // Cache for 1 hour
 
+// Kill a climate or farm scraper run that exceeds its retry and timeout budget
+const SCRAPER_TIMEOUT_MS = 120000;
+
 // Crop codes mapping for FAOSTAT API
 const crops = {
   '15': 'Wheat',
@@ -518,12 +521,165 @@ const getClimateData = async (req, res) => {
       
       // Create a temporary Python script to scrape climate data
       const climatePythonScript = `
+import os
 import sys
-import json
+import orjson
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+from types import MappingProxyType
+
+# SQLite cache kept next to the script so repeat runs skip the network
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fao_cache')
+
+# (connect, read) timeout in seconds for every request, so a silent host cannot hang a run
+REQUEST_TIMEOUT = (5, 30)
+
+# Longest wait in seconds between retries, whatever the server asks for
+MAX_RETRY_WAIT = 10
+
+# URL fragments of the JSON APIs; both scrapers share the cache, so the list covers both
+JSON_SOURCES = (
+    'fenixservices.fao.org',
+    'climateknowledgeportal.worldbank.org',
+    '54.229.242.119/GSOCmap',
+    'www.fao.org/giews/earthobservation/asis/data'
+)
+
+# Regions mapping
+REGIONS = MappingProxyType({
+    "1": "Northern Africa",
+    "2": "Eastern Africa",
+    "3": "Middle Africa",
+    "4": "Southern Africa",
+    "5": "Western Africa"
+})
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Headers of a GIEWS table holding monthly values, besides 'Month'
+MONTHLY_VALUE_HEADERS = frozenset({'Temperature', 'Rainfall'})
+
+class RateLimitRetry(Retry):
+    """Retry policy that also honours X-RateLimit-Reset when Retry-After is absent"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        reset = response.headers.get('X-RateLimit-Reset')
+        
+        if retry_after is None and reset is not None:
+            try:
+                retry_after = float(reset)
+            except ValueError:
+                return None
+            
+            # Values beyond a day are epoch timestamps rather than seconds to wait
+            if retry_after > 86400:
+                retry_after -= time.time()
+        
+        if retry_after is None:
+            return None
+        
+        return min(max(retry_after, 0), MAX_RETRY_WAIT)
+
+def is_cacheable(response):
+    """Keep HTML error pages served by the JSON APIs out of the cache"""
+    if any(source in response.url for source in JSON_SOURCES):
+        return is_json_response(response)
+    
+    return True
+
+def create_session():
+    """Create a cached keep-alive session that retries transient FAO errors"""
+    session = requests_cache.CachedSession(
+        CACHE_PATH,
+        backend='sqlite',
+        expire_after=timedelta(hours=24),
+        urls_expire_after={
+            'fenixservices.fao.org': timedelta(days=7),  # FAOSTAT annual statistics
+            'www.fao.org/giews': timedelta(hours=24),
+            'climateknowledgeportal.worldbank.org': timedelta(hours=24)
+        },
+        filter_fn=is_cacheable
+    )
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    
+    retries = RateLimitRetry(
+        total=5,
+        connect=1,  # Unreachable hosts fail fast instead of stacking connect timeouts
+        read=1,
+        backoff_factor=0.5,
+        backoff_max=MAX_RETRY_WAIT,
+        backoff_jitter=0.5,  # Spread out retries from the concurrent workers
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response back so status checks still apply
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
+
+# Shared session so repeated calls to the same host reuse one connection;
+# wrap calls in SESSION.cache_disabled() when fresh data is required
+SESSION = create_session()
+
+# Shared pool so the independent FAO requests run concurrently
+EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+def fetch_optional(url, params=None):
+    """GET an optional source, returning None instead of raising once retries are exhausted"""
+    try:
+        return SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {str(e)}", file=sys.stderr)
+        return None
+
+def fetch_optional_page(url):
+    """GET an optional HTML page, skipping the download when a HEAD shows nothing worth parsing"""
+    try:
+        head = SESSION.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Error probing {url}: {str(e)}", file=sys.stderr)
+        return None
+    
+    # Servers that reject HEAD or omit the headers still get the full GET
+    content_type = head.headers.get('Content-Type', '')
+    content_length = head.headers.get('Content-Length', '')
+    if head.status_code in (404, 410):
+        return None
+    if head.status_code == 200 and content_type and 'html' not in content_type:
+        return None
+    if head.status_code == 200 and content_length.isdigit() and int(content_length) <= 1024:
+        return None
+    
+    return fetch_optional(url)
+
+def row_cells(row, limit=3):
+    """Return up to the first \`limit\` cells of a table row without running a selector"""
+    return list(islice((node for node in row.iter() if node.tag == 'td'), limit))
+
+def is_json_response(response):
+    """Check the headers and first byte so HTML error pages never reach the JSON parser"""
+    content_type = response.headers.get('Content-Type', '')
+    return 'html' not in content_type and response.content[:64].lstrip()[:1] in (b'{', b'[')
+
+def faostat_records(response):
+    """Return the data records of a FAOSTAT response"""
+    if not is_json_response(response):
+        return ()
+    
+    data = orjson.loads(response.content)
+    return data.get('data', ()) if isinstance(data, dict) else ()
 
 def scrape_fao_climate_data(region_code, year_start, year_end):
     """
@@ -532,26 +688,6 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
     # FAO STAT domain for climate data
     url = "https://www.fao.org/faostat/en/#data/ET"
     
-    # Make request to the FAO website
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code != 200:
-        raise Exception(f"Failed to access FAO website: {response.status_code}")
-    
-    # Get the regions mapping
-    regions = {
-        "1": "Northern Africa",
-        "2": "Eastern Africa",
-        "3": "Middle Africa",
-        "4": "Southern Africa",
-        "5": "Western Africa"
-    }
-    
-    region_name = regions.get(region_code, "Northern Africa")
-    
     # Access the FAOSTAT API directly for temperature data
     api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/ET"
     params = {
@@ -561,27 +697,6 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
         "year_end": year_end
     }
     
-    api_response = requests.get(api_url, params=params, headers=headers)
-    
-    if api_response.status_code != 200:
-        raise Exception(f"Failed to access FAO API: {api_response.status_code}")
-    
-    data = api_response.json()
-    
-    # Process the API response
-    temperature_data = []
-    
-    if 'data' in data:
-        for item in data['data']:
-            year = item.get('year')
-            value = item.get('value')
-            if year and value:
-                temperature_data.append({
-                    'year': int(year),
-                    'value': float(value),
-                    'unit': '°C'
-                })
-    
     # For rainfall, use the AQUASTAT API
     rainfall_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/QCL"
     rainfall_params = {
@@ -591,51 +706,80 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
         "year_end": year_end
     }
     
-    rainfall_response = requests.get(rainfall_api_url, params=rainfall_params, headers=headers)
+    # For monthly data, scrape from GIEWS Earth Observation, with the
+    # Climate Change Knowledge Portal and GIEWS Country Briefs as fallbacks
+    monthly_url = "https://www.fao.org/giews/earthobservation/country/index.jsp?lang=en&code=" + region_code
+    wb_url = f"https://climateknowledgeportal.worldbank.org/api/data/region/{region_code}"
+    giews_url = f"https://www.fao.org/giews/countrybrief/country.jsp?code={region_code}"
+    
+    # The requests are independent, so fire them all before reading any response.
+    # FAOSTAT serves one domain per /data call, so the ET and QCL queries cannot be
+    # batched; running them concurrently on the shared session overlaps their latency
+    response_future = EXECUTOR.submit(SESSION.get, url, timeout=REQUEST_TIMEOUT)
+    api_future = EXECUTOR.submit(SESSION.get, api_url, params=params, timeout=REQUEST_TIMEOUT)
+    rainfall_future = EXECUTOR.submit(SESSION.get, rainfall_api_url, params=rainfall_params, timeout=REQUEST_TIMEOUT)
+    monthly_future = EXECUTOR.submit(fetch_optional_page, monthly_url)
+    wb_future = EXECUTOR.submit(fetch_optional, wb_url)
+    giews_future = EXECUTOR.submit(fetch_optional_page, giews_url)
+    
+    response = response_future.result()
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to access FAO website: {response.status_code}")
+    
+    region_name = REGIONS.get(region_code, "Northern Africa")
+    
+    api_response = api_future.result()
+    
+    if api_response.status_code != 200:
+        raise Exception(f"Failed to access FAO API: {api_response.status_code}")
+    
+    # Process the API response
+    temperature_data = [
+        {'year': int(year), 'value': float(value), 'unit': '°C'}
+        for item in faostat_records(api_response)
+        if (year := item.get('year')) and (value := item.get('value'))
+    ]
+    
+    rainfall_response = rainfall_future.result()
     
     if rainfall_response.status_code != 200:
         raise Exception(f"Failed to access FAO rainfall API: {rainfall_response.status_code}")
     
-    rainfall_data = []
-    rainfall_json = rainfall_response.json()
-    
-    if 'data' in rainfall_json:
-        for item in rainfall_json['data']:
-            year = item.get('year')
-            value = item.get('value')
-            if year and value:
-                rainfall_data.append({
-                    'year': int(year),
-                    'value': float(value),
-                    'unit': 'mm'
-                })
+    rainfall_data = [
+        {'year': int(year), 'value': float(value), 'unit': 'mm'}
+        for item in faostat_records(rainfall_response)
+        if (year := item.get('year')) and (value := item.get('value'))
+    ]
     
     # For monthly data, scrape from GIEWS Earth Observation
-    monthly_url = "https://www.fao.org/giews/earthobservation/country/index.jsp?lang=en&code=" + region_code
-    monthly_response = requests.get(monthly_url, headers=headers)
+    monthly_response = monthly_future.result()
     
     monthly_data = []
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     
-    if monthly_response.status_code == 200:
-        monthly_soup = BeautifulSoup(monthly_response.content, 'html.parser')
+    # Only parse the page when its raw bytes can hold a monthly climate table
+    monthly_body = monthly_response.content if monthly_response is not None else b''
+    has_monthly_table = b'Month' in monthly_body and (b'Temperature' in monthly_body or b'Rainfall' in monthly_body)
+    
+    if monthly_response is not None and monthly_response.status_code == 200 and has_monthly_table:
+        monthly_tree = LexborHTMLParser(monthly_body)
         
         # Extract monthly data from tables
-        tables = monthly_soup.select('table')
+        tables = monthly_tree.css('table')
         for table in tables:
-            headers = [th.text.strip() for th in table.select('th')]
-            if 'Month' in headers and ('Temperature' in headers or 'Rainfall' in headers):
-                rows = table.select('tr')[1:]  # Skip header row
+            headers = {th.text(strip=True) for th in table.css('th')}
+            if 'Month' in headers and headers & MONTHLY_VALUE_HEADERS:
+                rows = table.css('tr')[1:]  # Skip header row
                 for i, row in enumerate(rows):
-                    if i < len(months):
-                        cells = row.select('td')
+                    if i < len(MONTHS):
+                        cells = row_cells(row)
                         if len(cells) >= 3:
                             try:
-                                temp_value = float(cells[1].text.strip())
-                                rain_value = float(cells[2].text.strip())
+                                temp_value = float(cells[1].text(strip=True))
+                                rain_value = float(cells[2].text(strip=True))
                                 
                                 monthly_data.append({
-                                    "month": months[i],
+                                    "month": MONTHS[i],
                                     "temperature": temp_value,
                                     "rainfall": rain_value
                                 })
@@ -645,15 +789,14 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
     # If we couldn't get proper monthly data, try another approach
     if len(monthly_data) < 12:
         # Try to scrape from Climate Change Knowledge Portal
-        wb_url = f"https://climateknowledgeportal.worldbank.org/api/data/region/{region_code}"
-        wb_response = requests.get(wb_url, headers=headers)
+        wb_response = wb_future.result()
         
-        if wb_response.status_code == 200:
+        if wb_response is not None and wb_response.status_code == 200 and is_json_response(wb_response):
             try:
-                wb_data = wb_response.json()
+                wb_data = orjson.loads(wb_response.content)
                 if 'monthlyData' in wb_data:
                     monthly_data = []
-                    for month in months:
+                    for month in MONTHS:
                         month_data = wb_data['monthlyData'].get(month, {})
                         monthly_data.append({
                             "month": month,
@@ -666,25 +809,24 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
     # If we still don't have monthly data, try one more source
     if len(monthly_data) < 12:
         # Try FAO GIEWS Country Briefs
-        giews_url = f"https://www.fao.org/giews/countrybrief/country.jsp?code={region_code}"
-        giews_response = requests.get(giews_url, headers=headers)
+        giews_response = giews_future.result()
         
-        if giews_response.status_code == 200:
-            giews_soup = BeautifulSoup(giews_response.content, 'html.parser')
-            climate_tables = giews_soup.select('.climate-table')
+        if giews_response is not None and giews_response.status_code == 200 and b'climate-table' in giews_response.content:
+            giews_tree = LexborHTMLParser(giews_response.content)
+            climate_tables = giews_tree.css('.climate-table')
             
             if climate_tables:
-                rows = climate_tables[0].select('tr')
+                rows = climate_tables[0].css('tr')
                 for i, row in enumerate(rows[1:]):  # Skip header
-                    if i < len(months):
-                        cells = row.select('td')
+                    if i < len(MONTHS):
+                        cells = row_cells(row)
                         if len(cells) >= 3:
                             try:
-                                temp = float(cells[1].text.strip())
-                                rain = float(cells[2].text.strip())
+                                temp = float(cells[1].text(strip=True))
+                                rain = float(cells[2].text(strip=True))
                                 
                                 monthly_data.append({
-                                    "month": months[i],
+                                    "month": MONTHS[i],
                                     "temperature": temp,
                                     "rainfall": rain
                                 })
@@ -714,9 +856,9 @@ if __name__ == "__main__":
     
     try:
         result = scrape_fao_climate_data(region_code, year_start, year_end)
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result) + b"\\n")
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        sys.stdout.buffer.write(orjson.dumps({"error": str(e)}) + b"\\n")
         sys.exit(1)
 `;
   
@@ -732,13 +874,13 @@ if __name__ == "__main__":
       fs.writeFileSync(climatePythonScriptPath, climatePythonScript);
       
       // Execute the Python script
-      exec(`python "${climatePythonScriptPath}" ${regionCode} ${year_start} ${year_end}`, (error, stdout, stderr) => {
+      exec(`python "${climatePythonScriptPath}" ${regionCode} ${year_start} ${year_end}`, { timeout: SCRAPER_TIMEOUT_MS }, (error, stdout, stderr) => {
         if (error) {
           console.error(`Error executing climate Python script: ${error.message}`);
           console.error(`stderr: ${stderr}`);
           return res.status(500).json({ 
             error: 'Failed to fetch climate data', 
-            details: 'Error executing Python script. Make sure requests and BeautifulSoup are installed.'
+            details: 'Error executing Python script. Make sure the packages in requirements.txt are installed.'
           });
         }
         
@@ -791,12 +933,194 @@ const getFarmAnalytics = async (req, res) => {
       
       // Create a temporary Python script to scrape farm data
       const farmPythonScript = `
+import os
 import sys
-import json
+import orjson
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import MappingProxyType
+
+# SQLite cache kept next to the script so repeat runs skip the network
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fao_cache')
+
+# (connect, read) timeout in seconds for every request, so a silent host cannot hang a run
+REQUEST_TIMEOUT = (5, 30)
+
+# Longest wait in seconds between retries, whatever the server asks for
+MAX_RETRY_WAIT = 10
+
+# URL fragments of the JSON APIs; both scrapers share the cache, so the list covers both
+JSON_SOURCES = (
+    'fenixservices.fao.org',
+    'climateknowledgeportal.worldbank.org',
+    '54.229.242.119/GSOCmap',
+    'www.fao.org/giews/earthobservation/asis/data'
+)
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Farm names mapping based on region
+FARM_NAMES = MappingProxyType({
+    "1": ("Green Valley Farm", "Sahara Oasis", "Atlas Highland"),
+    "2": ("Eastern Plains", "Highland Ranch", "Victoria Farm"),
+    "3": ("Congo Basin Farm", "Equatorial Estate", "Rainforest Plantation"),
+    "4": ("Kalahari Estate", "Cape Vineyard", "Southern Meadows"),
+    "5": ("Savanna Ranch", "Niger Delta Farm", "Coastal Plantation")
+})
+
+# Region coordinates (approximate centers)
+REGION_COORDS = MappingProxyType({
+    "1": {"lat": 30.8, "lng": 9.4},    # Northern Africa
+    "2": {"lat": 0.3, "lng": 37.9},    # Eastern Africa
+    "3": {"lat": 6.6, "lng": 20.9},    # Middle Africa
+    "4": {"lat": -26.5, "lng": 24.7},  # Southern Africa
+    "5": {"lat": 11.7, "lng": -4.3}    # Western Africa
+})
+
+# Different water usage patterns based on region
+WATER_PATTERNS = MappingProxyType({
+    "1": {"rain_base": 30, "rain_peak": 0, "irr_base": 50, "irr_peak": 6},  # Northern Africa
+    "2": {"rain_base": 60, "rain_peak": 3, "irr_base": 40, "irr_peak": 7},  # Eastern Africa
+    "3": {"rain_base": 100, "rain_peak": 7, "irr_base": 30, "irr_peak": 1}, # Middle Africa
+    "4": {"rain_base": 50, "rain_peak": 1, "irr_base": 45, "irr_peak": 7},  # Southern Africa
+    "5": {"rain_base": 80, "rain_peak": 8, "irr_base": 35, "irr_peak": 2}   # Western Africa
+})
+
+# Default risk assessment, copied per call since it is part of the output
+DEFAULT_RISK_ASSESSMENT = (
+    {
+        "type": "Drought",
+        "probability": 50,
+        "impact": 3,
+        "mitigation": "Implement water conservation practices and drought-resistant crop varieties."
+    },
+    {
+        "type": "Pest Infestation",
+        "probability": 40,
+        "impact": 3,
+        "mitigation": "Regular monitoring and integrated pest management strategies."
+    },
+    {
+        "type": "Extreme Weather",
+        "probability": 30,
+        "impact": 4,
+        "mitigation": "Weather-resistant infrastructure and crop insurance."
+    },
+    {
+        "type": "Soil Degradation",
+        "probability": 35,
+        "impact": 3,
+        "mitigation": "Implement crop rotation and cover crops to maintain soil health."
+    }
+)
+
+IRRIGATION_TYPES = ('Drip', 'Sprinkler', 'Flood', 'Center Pivot', 'Subsurface')
+
+# Different regions tend to use different irrigation methods
+REGIONAL_PREFERENCES = MappingProxyType({
+    "1": (0, 2, 4),  # Northern Africa: Drip, Flood, Subsurface
+    "2": (0, 1, 3),  # Eastern Africa: Drip, Sprinkler, Center Pivot
+    "3": (1, 2, 4),  # Middle Africa: Sprinkler, Flood, Subsurface
+    "4": (0, 1, 3),  # Southern Africa: Drip, Sprinkler, Center Pivot
+    "5": (1, 2, 3)   # Western Africa: Sprinkler, Flood, Center Pivot
+})
+
+class RateLimitRetry(Retry):
+    """Retry policy that also honours X-RateLimit-Reset when Retry-After is absent"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        reset = response.headers.get('X-RateLimit-Reset')
+        
+        if retry_after is None and reset is not None:
+            try:
+                retry_after = float(reset)
+            except ValueError:
+                return None
+            
+            # Values beyond a day are epoch timestamps rather than seconds to wait
+            if retry_after > 86400:
+                retry_after -= time.time()
+        
+        if retry_after is None:
+            return None
+        
+        return min(max(retry_after, 0), MAX_RETRY_WAIT)
+
+def is_cacheable(response):
+    """Keep HTML error pages served by the JSON APIs out of the cache"""
+    if any(source in response.url for source in JSON_SOURCES):
+        return is_json_response(response)
+    
+    return True
+
+def create_session():
+    """Create a cached keep-alive session that retries transient FAO errors"""
+    session = requests_cache.CachedSession(
+        CACHE_PATH,
+        backend='sqlite',
+        expire_after=timedelta(hours=24),
+        urls_expire_after={
+            'fenixservices.fao.org': timedelta(days=7),  # FAOSTAT annual statistics
+            'www.fao.org/giews': timedelta(hours=24),
+            'climateknowledgeportal.worldbank.org': timedelta(hours=24)
+        },
+        filter_fn=is_cacheable
+    )
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    
+    retries = RateLimitRetry(
+        total=5,
+        connect=1,  # Unreachable hosts fail fast instead of stacking connect timeouts
+        read=1,
+        backoff_factor=0.5,
+        backoff_max=MAX_RETRY_WAIT,
+        backoff_jitter=0.5,  # Spread out retries from the concurrent workers
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response back so status checks still apply
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
+
+# Shared session so repeated calls to the same host reuse one connection;
+# wrap calls in SESSION.cache_disabled() when fresh data is required
+SESSION = create_session()
+
+# Shared pool so the independent FAO requests run concurrently
+EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+def fetch_optional(url, params=None):
+    """GET an optional source, returning None instead of raising once retries are exhausted"""
+    try:
+        return SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {str(e)}", file=sys.stderr)
+        return None
+
+def is_json_response(response):
+    """Check the headers and first byte so HTML error pages never reach the JSON parser"""
+    content_type = response.headers.get('Content-Type', '')
+    return 'html' not in content_type and response.content[:64].lstrip()[:1] in (b'{', b'[')
+
+def faostat_records(response):
+    """Return the data records of a FAOSTAT response"""
+    if not is_json_response(response):
+        return ()
+    
+    data = orjson.loads(response.content)
+    return data.get('data', ()) if isinstance(data, dict) else ()
 
 def scrape_fao_farm_data(farm_id, region_id):
     """
@@ -805,62 +1129,76 @@ def scrape_fao_farm_data(farm_id, region_id):
     # FAO STAT domain for farm data
     url = "https://www.fao.org/faostat/en/#data/QCL"
     
-    # Make request to the FAO website
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    # Access the FAOSTAT API for agricultural land data
+    land_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/RL"
+    land_params = {
+        "area": region_id,
+        "element": "5110",  # Agricultural land
+        "year": "2020"      # Most recent year
     }
-    response = requests.get(url, headers=headers)
     
-    if response.status_code != 200:
-        raise Exception(f"Failed to access FAO website: {response.status_code}")
+    # Access soil data from FAO Soil Portal API
+    soil_api_url = f"http://54.229.242.119/GSOCmap/api/v1/soc/region/{region_id}"
     
-    # Parse the HTML content
-    soup = BeautifulSoup(response.content, 'html.parser')
+    # Get crop production data from FAOSTAT
+    crop_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/QCL"
+    crop_params = {
+        "area": region_id,
+        "item": "15,27,44,56",  # Wheat, Rice, Barley, Maize
+        "element": "5510",      # Production
+        "year": "2020"
+    }
+    
+    # Get water usage data from AQUASTAT
+    water_api_url = "http://www.fao.org/nr/water/aquastat/data/query/results.html"
+    water_params = {
+        "regionQuery": region_id,
+        "yearRange": "2015-2020",
+        "varGrpIds": "4250,4251,4252",  # Water withdrawal variables
+        "showCodes": "true",
+        "newestOnly": "true"
+    }
     
-    # Farm names mapping based on region
-    farm_names = {
-        "1": ["Green Valley Farm", "Sahara Oasis", "Atlas Highland"],
-        "2": ["Eastern Plains", "Highland Ranch", "Victoria Farm"],
-        "3": ["Congo Basin Farm", "Equatorial Estate", "Rainforest Plantation"],
-        "4": ["Kalahari Estate", "Cape Vineyard", "Southern Meadows"],
-        "5": ["Savanna Ranch", "Niger Delta Farm", "Coastal Plantation"]
+    # Get risk assessment data from FAO Early Warning System
+    risk_api_url = "http://www.fao.org/giews/earthobservation/asis/data/country-indicators"
+    risk_params = {
+        "code": region_id,
+        "type": "json"
     }
     
+    # The requests are independent, so fire them all before reading any response.
+    # FAOSTAT serves one domain per /data call, so the RL and QCL queries cannot be
+    # batched; running them concurrently on the shared session overlaps their latency
+    response_future = EXECUTOR.submit(SESSION.get, url, timeout=REQUEST_TIMEOUT)
+    land_future = EXECUTOR.submit(SESSION.get, land_api_url, params=land_params, timeout=REQUEST_TIMEOUT)
+    soil_future = EXECUTOR.submit(fetch_optional, soil_api_url)
+    crop_future = EXECUTOR.submit(fetch_optional, crop_api_url, params=crop_params)
+    water_future = EXECUTOR.submit(fetch_optional, water_api_url, params=water_params)
+    risk_future = EXECUTOR.submit(fetch_optional, risk_api_url, params=risk_params)
+    
+    response = response_future.result()
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to access FAO website: {response.status_code}")
+    
     # Get farm name based on region and farm ID
-    farm_list = farm_names.get(region_id, ["Unknown Farm"])
+    farm_list = FARM_NAMES.get(region_id, ("Unknown Farm",))
     farm_index = int(farm_id) % len(farm_list)
     farm_name = farm_list[farm_index]
     
-    # Region coordinates (approximate centers)
-    region_coords = {
-        "1": {"lat": 30.8, "lng": 9.4},    # Northern Africa
-        "2": {"lat": 0.3, "lng": 37.9},    # Eastern Africa
-        "3": {"lat": 6.6, "lng": 20.9},    # Middle Africa
-        "4": {"lat": -26.5, "lng": 24.7},  # Southern Africa
-        "5": {"lat": 11.7, "lng": -4.3}    # Western Africa
-    }
-    
     # Get base coordinates for the region
-    base_coords = region_coords.get(region_id, {"lat": 0, "lng": 0})
+    base_coords = REGION_COORDS.get(region_id, {"lat": 0, "lng": 0})
     
     # Add small offset to create unique farm location
     lat_offset = (int(farm_id) * 0.1) % 1.0
     lng_offset = (int(farm_id) * 0.15) % 1.5
     
-    # Access the FAOSTAT API for agricultural land data
-    land_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/RL"
-    land_params = {
-        "area": region_id,
-        "element": "5110",  # Agricultural land
-        "year": "2020"      # Most recent year
-    }
-    
-    land_response = requests.get(land_api_url, params=land_params, headers=headers)
+    land_response = land_future.result()
     
     if land_response.status_code != 200:
         raise Exception(f"Failed to access FAO land API: {land_response.status_code}")
     
-    land_data = land_response.json()
+    land_data = orjson.loads(land_response.content) if is_json_response(land_response) else {}
     
     # Calculate farm size based on regional agricultural land data
     farm_size = 100  # Default size in hectares
@@ -869,9 +1207,7 @@ def scrape_fao_farm_data(farm_id, region_id):
         # Scale farm size based on regional agricultural land
         farm_size = max(50, min(1000, total_ag_land / 10000))
     
-    # Access soil data from FAO Soil Portal API
-    soil_api_url = f"http://54.229.242.119/GSOCmap/api/v1/soc/region/{region_id}"
-    soil_response = requests.get(soil_api_url, headers=headers)
+    soil_response = soil_future.result()
     
     soil_data = {
         "ph": 6.5,
@@ -882,9 +1218,9 @@ def scrape_fao_farm_data(farm_id, region_id):
         "water_holding_capacity": 0.15
     }
     
-    if soil_response.status_code == 200:
+    if soil_response is not None and soil_response.status_code == 200 and is_json_response(soil_response):
         try:
-            soil_json = soil_response.json()
+            soil_json = orjson.loads(soil_response.content)
             if 'properties' in soil_json:
                 props = soil_json['properties']
                 soil_data = {
@@ -898,16 +1234,7 @@ def scrape_fao_farm_data(farm_id, region_id):
         except:
             pass
     
-    # Get crop production data from FAOSTAT
-    crop_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/QCL"
-    crop_params = {
-        "area": region_id,
-        "item": "15,27,44,56",  # Wheat, Rice, Barley, Maize
-        "element": "5510",      # Production
-        "year": "2020"
-    }
-    
-    crop_response = requests.get(crop_api_url, params=crop_params, headers=headers)
+    crop_response = crop_future.result()
     
     # Default crop distribution
     field_distribution = [
@@ -917,66 +1244,45 @@ def scrape_fao_farm_data(farm_id, region_id):
         {"name": "Fallow", "value": 10}
     ]
     
-    if crop_response.status_code == 200:
-        crop_json = crop_response.json()
-        if 'data' in crop_json:
-            crops = {}
-            total = 0
-            
-            for item in crop_json['data']:
-                crop_name = item.get('item_name', '')
-                value = item.get('value', 0)
-                
-                if crop_name and value:
-                    crops[crop_name] = value
-                    total += value
+    if crop_response is not None and crop_response.status_code == 200:
+        crops = {}
+        total = 0
+        
+        for item in faostat_records(crop_response):
+            crop_name = item.get('item_name', '')
+            value = item.get('value', 0)
             
-            if total > 0:
-                field_distribution = []
-                for crop, value in crops.items():
-                    percentage = (value / total) * 70  # Scale to leave room for fallow land
-                    field_distribution.append({
-                        "name": crop,
-                        "value": round(percentage)
-                    })
-                
-                # Add fallow land
+            if crop_name and value:
+                crops[crop_name] = value
+                total += value
+        
+        if total > 0:
+            field_distribution = []
+            assigned = 0
+            for crop, value in crops.items():
+                percentage = round((value / total) * 70)  # Scale to leave room for fallow land
+                assigned += percentage
                 field_distribution.append({
-                    "name": "Fallow",
-                    "value": max(5, 100 - sum(item["value"] for item in field_distribution))
+                    "name": crop,
+                    "value": percentage
                 })
+            
+            # Add fallow land
+            field_distribution.append({
+                "name": "Fallow",
+                "value": max(5, 100 - assigned)
+            })
     
-    # Get water usage data from AQUASTAT
-    water_api_url = "http://www.fao.org/nr/water/aquastat/data/query/results.html"
-    water_params = {
-        "regionQuery": region_id,
-        "yearRange": "2015-2020",
-        "varGrpIds": "4250,4251,4252",  # Water withdrawal variables
-        "showCodes": "true",
-        "newestOnly": "true"
-    }
-    
-    water_response = requests.get(water_api_url, params=water_params, headers=headers)
+    water_response = water_future.result()
     
     # Generate water usage data based on regional patterns
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     water_usage = []
+    pattern = WATER_PATTERNS.get(region_id, WATER_PATTERNS["1"])
     
-    # Different water usage patterns based on region
-    patterns = {
-        "1": {"rain_base": 30, "rain_peak": 0, "irr_base": 50, "irr_peak": 6},  # Northern Africa
-        "2": {"rain_base": 60, "rain_peak": 3, "irr_base": 40, "irr_peak": 7},  # Eastern Africa
-        "3": {"rain_base": 100, "rain_peak": 7, "irr_base": 30, "irr_peak": 1}, # Middle Africa
-        "4": {"rain_base": 50, "rain_peak": 1, "irr_base": 45, "irr_peak": 7},  # Southern Africa
-        "5": {"rain_base": 80, "rain_peak": 8, "irr_base": 35, "irr_peak": 2}   # Western Africa
-    }
-    
-    pattern = patterns.get(region_id, patterns["1"])
-    
-    if water_response.status_code == 200:
+    if water_response is not None and water_response.status_code == 200 and b'dataTable' in water_response.content:
         # Try to parse real water data
-        water_soup = BeautifulSoup(water_response.content, 'html.parser')
-        water_tables = water_soup.select('table.dataTable')
+        water_tree = LexborHTMLParser(water_response.content)
+        water_tables = water_tree.css('table.dataTable')
         
         if water_tables:
             # Extract real water data if available
@@ -985,7 +1291,7 @@ def scrape_fao_farm_data(farm_id, region_id):
     
     # If we couldn't get real monthly water data, create it based on regional patterns
     if not water_usage:
-        for i, month in enumerate(months):
+        for i, month in enumerate(MONTHS):
             # Calculate rainfall based on seasonal patterns
             rain_offset = abs((i - pattern["rain_peak"]) % 12)
             if rain_offset > 6:
@@ -1008,46 +1314,14 @@ def scrape_fao_farm_data(farm_id, region_id):
                 "efficiency": round(efficiency)
             })
     
-    # Get risk assessment data from FAO Early Warning System
-    risk_api_url = "http://www.fao.org/giews/earthobservation/asis/data/country-indicators"
-    risk_params = {
-        "code": region_id,
-        "type": "json"
-    }
-    
-    risk_response = requests.get(risk_api_url, params=risk_params, headers=headers)
+    risk_response = risk_future.result()
     
     # Default risk assessment
-    risk_assessment = [
-        {
-            "type": "Drought",
-            "probability": 50,
-            "impact": 3,
-            "mitigation": "Implement water conservation practices and drought-resistant crop varieties."
-        },
-        {
-            "type": "Pest Infestation",
-            "probability": 40,
-            "impact": 3,
-            "mitigation": "Regular monitoring and integrated pest management strategies."
-        },
-        {
-            "type": "Extreme Weather",
-            "probability": 30,
-            "impact": 4,
-            "mitigation": "Weather-resistant infrastructure and crop insurance."
-        },
-        {
-            "type": "Soil Degradation",
-            "probability": 35,
-            "impact": 3,
-            "mitigation": "Implement crop rotation and cover crops to maintain soil health."
-        }
-    ]
+    risk_assessment = [dict(risk) for risk in DEFAULT_RISK_ASSESSMENT]
     
-    if risk_response.status_code == 200:
+    if risk_response is not None and risk_response.status_code == 200 and is_json_response(risk_response):
         try:
-            risk_json = risk_response.json()
+            risk_json = orjson.loads(risk_response.content)
             if 'indicators' in risk_json:
                 # Parse real risk data
                 # Implementation would depend on the actual structure of the API response
@@ -1080,8 +1354,6 @@ def scrape_fao_farm_data(farm_id, region_id):
 
 def get_soil_type(ph, organic_matter):
     """Determine soil type based on pH and organic matter"""
-    soil_types = ['Clay Loam', 'Sandy Loam', 'Silt Loam', 'Loamy Sand', 'Silty Clay']
-    
     if ph < 5.5:
         return 'Sandy Loam' if organic_matter < 3 else 'Loamy Sand'
     elif ph < 6.5:
@@ -1091,21 +1363,10 @@ def get_soil_type(ph, organic_matter):
 
 def get_irrigation_type(region_id, farm_id):
     """Determine irrigation type based on region and farm ID"""
-    irrigation_types = ['Drip', 'Sprinkler', 'Flood', 'Center Pivot', 'Subsurface']
-    
-    # Different regions tend to use different irrigation methods
-    regional_preferences = {
-        "1": [0, 2, 4],  # Northern Africa: Drip, Flood, Subsurface
-        "2": [0, 1, 3],  # Eastern Africa: Drip, Sprinkler, Center Pivot
-        "3": [1, 2, 4],  # Middle Africa: Sprinkler, Flood, Subsurface
-        "4": [0, 1, 3],  # Southern Africa: Drip, Sprinkler, Center Pivot
-        "5": [1, 2, 3]   # Western Africa: Sprinkler, Flood, Center Pivot
-    }
-    
-    preferences = regional_preferences.get(region_id, [0, 1, 2])
+    preferences = REGIONAL_PREFERENCES.get(region_id, (0, 1, 2))
     index = int(farm_id) % len(preferences)
     
-    return irrigation_types[preferences[index]]
+    return IRRIGATION_TYPES[preferences[index]]
 
 # Main execution
 if __name__ == "__main__":
@@ -1118,9 +1379,9 @@ if __name__ == "__main__":
     
     try:
         result = scrape_fao_farm_data(farm_id, region_id)
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result) + b"\\n")
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        sys.stdout.buffer.write(orjson.dumps({"error": str(e)}) + b"\\n")
         sys.exit(1)
 `;
   
@@ -1136,13 +1397,13 @@ if __name__ == "__main__":
       fs.writeFileSync(farmPythonScriptPath, farmPythonScript);
       
       // Execute the Python script
-      exec(`python "${farmPythonScriptPath}" ${farmId} ${regionId}`, (error, stdout, stderr) => {
+      exec(`python "${farmPythonScriptPath}" ${farmId} ${regionId}`, { timeout: SCRAPER_TIMEOUT_MS }, (error, stdout, stderr) => {
         if (error) {
           console.error(`Error executing farm Python script: ${error.message}`);
           console.error(`stderr: ${stderr}`);
           return res.status(500).json({ 
             error: 'Failed to fetch farm analytics data', 
-            details: 'Error executing Python script. Make sure requests and BeautifulSoup are installed.'
+            details: 'Error executing Python script. Make sure the packages in requirements.txt are installed.'
           });
         }
         
@@ -1,10 +1,163 @@
 
+import os
 import sys
-import json
+import orjson
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+from types import MappingProxyType
+
+# SQLite cache kept next to the script so repeat runs skip the network
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fao_cache')
+
+# (connect, read) timeout in seconds for every request, so a silent host cannot hang a run
+REQUEST_TIMEOUT = (5, 30)
+
+# Longest wait in seconds between retries, whatever the server asks for
+MAX_RETRY_WAIT = 10
+
+# URL fragments of the JSON APIs; both scrapers share the cache, so the list covers both
+JSON_SOURCES = (
+    'fenixservices.fao.org',
+    'climateknowledgeportal.worldbank.org',
+    '54.229.242.119/GSOCmap',
+    'www.fao.org/giews/earthobservation/asis/data'
+)
+
+# Regions mapping
+REGIONS = MappingProxyType({
+    "1": "Northern Africa",
+    "2": "Eastern Africa",
+    "3": "Middle Africa",
+    "4": "Southern Africa",
+    "5": "Western Africa"
+})
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Headers of a GIEWS table holding monthly values, besides 'Month'
+MONTHLY_VALUE_HEADERS = frozenset({'Temperature', 'Rainfall'})
+
+class RateLimitRetry(Retry):
+    """Retry policy that also honours X-RateLimit-Reset when Retry-After is absent"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        reset = response.headers.get('X-RateLimit-Reset')
+        
+        if retry_after is None and reset is not None:
+            try:
+                retry_after = float(reset)
+            except ValueError:
+                return None
+            
+            # Values beyond a day are epoch timestamps rather than seconds to wait
+            if retry_after > 86400:
+                retry_after -= time.time()
+        
+        if retry_after is None:
+            return None
+        
+        return min(max(retry_after, 0), MAX_RETRY_WAIT)
+
+def is_cacheable(response):
+    """Keep HTML error pages served by the JSON APIs out of the cache"""
+    if any(source in response.url for source in JSON_SOURCES):
+        return is_json_response(response)
+    
+    return True
+
+def create_session():
+    """Create a cached keep-alive session that retries transient FAO errors"""
+    session = requests_cache.CachedSession(
+        CACHE_PATH,
+        backend='sqlite',
+        expire_after=timedelta(hours=24),
+        urls_expire_after={
+            'fenixservices.fao.org': timedelta(days=7),  # FAOSTAT annual statistics
+            'www.fao.org/giews': timedelta(hours=24),
+            'climateknowledgeportal.worldbank.org': timedelta(hours=24)
+        },
+        filter_fn=is_cacheable
+    )
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    
+    retries = RateLimitRetry(
+        total=5,
+        connect=1,  # Unreachable hosts fail fast instead of stacking connect timeouts
+        read=1,
+        backoff_factor=0.5,
+        backoff_max=MAX_RETRY_WAIT,
+        backoff_jitter=0.5,  # Spread out retries from the concurrent workers
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response back so status checks still apply
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
+
+# Shared session so repeated calls to the same host reuse one connection;
+# wrap calls in SESSION.cache_disabled() when fresh data is required
+SESSION = create_session()
+
+# Shared pool so the independent FAO requests run concurrently
+EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+def fetch_optional(url, params=None):
+    """GET an optional source, returning None instead of raising once retries are exhausted"""
+    try:
+        return SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {str(e)}", file=sys.stderr)
+        return None
+
+def fetch_optional_page(url):
+    """GET an optional HTML page, skipping the download when a HEAD shows nothing worth parsing"""
+    try:
+        head = SESSION.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Error probing {url}: {str(e)}", file=sys.stderr)
+        return None
+    
+    # Servers that reject HEAD or omit the headers still get the full GET
+    content_type = head.headers.get('Content-Type', '')
+    content_length = head.headers.get('Content-Length', '')
+    if head.status_code in (404, 410):
+        return None
+    if head.status_code == 200 and content_type and 'html' not in content_type:
+        return None
+    if head.status_code == 200 and content_length.isdigit() and int(content_length) <= 1024:
+        return None
+    
+    return fetch_optional(url)
+
+def row_cells(row, limit=3):
+    """Return up to the first `limit` cells of a table row without running a selector"""
+    return list(islice((node for node in row.iter() if node.tag == 'td'), limit))
+
+def is_json_response(response):
+    """Check the headers and first byte so HTML error pages never reach the JSON parser"""
+    content_type = response.headers.get('Content-Type', '')
+    return 'html' not in content_type and response.content[:64].lstrip()[:1] in (b'{', b'[')
+
+def faostat_records(response):
+    """Return the data records of a FAOSTAT response"""
+    if not is_json_response(response):
+        return ()
+    
+    data = orjson.loads(response.content)
+    return data.get('data', ()) if isinstance(data, dict) else ()
 
 def scrape_fao_climate_data(region_code, year_start, year_end):
     """
@@ -13,26 +166,6 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
     # FAO STAT domain for climate data
     url = "https://www.fao.org/faostat/en/#data/ET"
     
-    # Make request to the FAO website
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code != 200:
-        raise Exception(f"Failed to access FAO website: {response.status_code}")
-    
-    # Get the regions mapping
-    regions = {
-        "1": "Northern Africa",
-        "2": "Eastern Africa",
-        "3": "Middle Africa",
-        "4": "Southern Africa",
-        "5": "Western Africa"
-    }
-    
-    region_name = regions.get(region_code, "Northern Africa")
-    
     # Access the FAOSTAT API directly for temperature data
     api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/ET"
     params = {
@@ -42,27 +175,6 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
         "year_end": year_end
     }
     
-    api_response = requests.get(api_url, params=params, headers=headers)
-    
-    if api_response.status_code != 200:
-        raise Exception(f"Failed to access FAO API: {api_response.status_code}")
-    
-    data = api_response.json()
-    
-    # Process the API response
-    temperature_data = []
-    
-    if 'data' in data:
-        for item in data['data']:
-            year = item.get('year')
-            value = item.get('value')
-            if year and value:
-                temperature_data.append({
-                    'year': int(year),
-                    'value': float(value),
-                    'unit': '°C'
-                })
-    
     # For rainfall, use the AQUASTAT API
     rainfall_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/QCL"
     rainfall_params = {
@@ -72,51 +184,80 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
         "year_end": year_end
     }
     
-    rainfall_response = requests.get(rainfall_api_url, params=rainfall_params, headers=headers)
+    # For monthly data, scrape from GIEWS Earth Observation, with the
+    # Climate Change Knowledge Portal and GIEWS Country Briefs as fallbacks
+    monthly_url = "https://www.fao.org/giews/earthobservation/country/index.jsp?lang=en&code=" + region_code
+    wb_url = f"https://climateknowledgeportal.worldbank.org/api/data/region/{region_code}"
+    giews_url = f"https://www.fao.org/giews/countrybrief/country.jsp?code={region_code}"
+    
+    # The requests are independent, so fire them all before reading any response.
+    # FAOSTAT serves one domain per /data call, so the ET and QCL queries cannot be
+    # batched; running them concurrently on the shared session overlaps their latency
+    response_future = EXECUTOR.submit(SESSION.get, url, timeout=REQUEST_TIMEOUT)
+    api_future = EXECUTOR.submit(SESSION.get, api_url, params=params, timeout=REQUEST_TIMEOUT)
+    rainfall_future = EXECUTOR.submit(SESSION.get, rainfall_api_url, params=rainfall_params, timeout=REQUEST_TIMEOUT)
+    monthly_future = EXECUTOR.submit(fetch_optional_page, monthly_url)
+    wb_future = EXECUTOR.submit(fetch_optional, wb_url)
+    giews_future = EXECUTOR.submit(fetch_optional_page, giews_url)
+    
+    response = response_future.result()
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to access FAO website: {response.status_code}")
+    
+    region_name = REGIONS.get(region_code, "Northern Africa")
+    
+    api_response = api_future.result()
+    
+    if api_response.status_code != 200:
+        raise Exception(f"Failed to access FAO API: {api_response.status_code}")
+    
+    # Process the API response
+    temperature_data = [
+        {'year': int(year), 'value': float(value), 'unit': '°C'}
+        for item in faostat_records(api_response)
+        if (year := item.get('year')) and (value := item.get('value'))
+    ]
+    
+    rainfall_response = rainfall_future.result()
     
     if rainfall_response.status_code != 200:
         raise Exception(f"Failed to access FAO rainfall API: {rainfall_response.status_code}")
     
-    rainfall_data = []
-    rainfall_json = rainfall_response.json()
-    
-    if 'data' in rainfall_json:
-        for item in rainfall_json['data']:
-            year = item.get('year')
-            value = item.get('value')
-            if year and value:
-                rainfall_data.append({
-                    'year': int(year),
-                    'value': float(value),
-                    'unit': 'mm'
-                })
+    rainfall_data = [
+        {'year': int(year), 'value': float(value), 'unit': 'mm'}
+        for item in faostat_records(rainfall_response)
+        if (year := item.get('year')) and (value := item.get('value'))
+    ]
     
     # For monthly data, scrape from GIEWS Earth Observation
-    monthly_url = "https://www.fao.org/giews/earthobservation/country/index.jsp?lang=en&code=" + region_code
-    monthly_response = requests.get(monthly_url, headers=headers)
+    monthly_response = monthly_future.result()
     
     monthly_data = []
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     
-    if monthly_response.status_code == 200:
-        monthly_soup = BeautifulSoup(monthly_response.content, 'html.parser')
+    # Only parse the page when its raw bytes can hold a monthly climate table
+    monthly_body = monthly_response.content if monthly_response is not None else b''
+    has_monthly_table = b'Month' in monthly_body and (b'Temperature' in monthly_body or b'Rainfall' in monthly_body)
+    
+    if monthly_response is not None and monthly_response.status_code == 200 and has_monthly_table:
+        monthly_tree = LexborHTMLParser(monthly_body)
         
         # Extract monthly data from tables
-        tables = monthly_soup.select('table')
+        tables = monthly_tree.css('table')
         for table in tables:
-            headers = [th.text.strip() for th in table.select('th')]
-            if 'Month' in headers and ('Temperature' in headers or 'Rainfall' in headers):
-                rows = table.select('tr')[1:]  # Skip header row
+            headers = {th.text(strip=True) for th in table.css('th')}
+            if 'Month' in headers and headers & MONTHLY_VALUE_HEADERS:
+                rows = table.css('tr')[1:]  # Skip header row
                 for i, row in enumerate(rows):
-                    if i < len(months):
-                        cells = row.select('td')
+                    if i < len(MONTHS):
+                        cells = row_cells(row)
                         if len(cells) >= 3:
                             try:
-                                temp_value = float(cells[1].text.strip())
-                                rain_value = float(cells[2].text.strip())
+                                temp_value = float(cells[1].text(strip=True))
+                                rain_value = float(cells[2].text(strip=True))
                                 
                                 monthly_data.append({
-                                    "month": months[i],
+                                    "month": MONTHS[i],
                                     "temperature": temp_value,
                                     "rainfall": rain_value
                                 })
@@ -126,15 +267,14 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
     # If we couldn't get proper monthly data, try another approach
     if len(monthly_data) < 12:
         # Try to scrape from Climate Change Knowledge Portal
-        wb_url = f"https://climateknowledgeportal.worldbank.org/api/data/region/{region_code}"
-        wb_response = requests.get(wb_url, headers=headers)
+        wb_response = wb_future.result()
         
-        if wb_response.status_code == 200:
+        if wb_response is not None and wb_response.status_code == 200 and is_json_response(wb_response):
             try:
-                wb_data = wb_response.json()
+                wb_data = orjson.loads(wb_response.content)
                 if 'monthlyData' in wb_data:
                     monthly_data = []
-                    for month in months:
+                    for month in MONTHS:
                         month_data = wb_data['monthlyData'].get(month, {})
                         monthly_data.append({
                             "month": month,
@@ -147,25 +287,24 @@ def scrape_fao_climate_data(region_code, year_start, year_end):
     # If we still don't have monthly data, try one more source
     if len(monthly_data) < 12:
         # Try FAO GIEWS Country Briefs
-        giews_url = f"https://www.fao.org/giews/countrybrief/country.jsp?code={region_code}"
-        giews_response = requests.get(giews_url, headers=headers)
+        giews_response = giews_future.result()
         
-        if giews_response.status_code == 200:
-            giews_soup = BeautifulSoup(giews_response.content, 'html.parser')
-            climate_tables = giews_soup.select('.climate-table')
+        if giews_response is not None and giews_response.status_code == 200 and b'climate-table' in giews_response.content:
+            giews_tree = LexborHTMLParser(giews_response.content)
+            climate_tables = giews_tree.css('.climate-table')
             
             if climate_tables:
-                rows = climate_tables[0].select('tr')
+                rows = climate_tables[0].css('tr')
                 for i, row in enumerate(rows[1:]):  # Skip header
-                    if i < len(months):
-                        cells = row.select('td')
+                    if i < len(MONTHS):
+                        cells = row_cells(row)
                         if len(cells) >= 3:
                             try:
-                                temp = float(cells[1].text.strip())
-                                rain = float(cells[2].text.strip())
+                                temp = float(cells[1].text(strip=True))
+                                rain = float(cells[2].text(strip=True))
                                 
                                 monthly_data.append({
-                                    "month": months[i],
+                                    "month": MONTHS[i],
                                     "temperature": temp,
                                     "rainfall": rain
                                 })
@@ -195,7 +334,7 @@ if __name__ == "__main__":
     
     try:
         result = scrape_fao_climate_data(region_code, year_start, year_end)
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result) + b"\n")
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        sys.stdout.buffer.write(orjson.dumps({"error": str(e)}) + b"\n")
         sys.exit(1)
@@ -1,10 +1,192 @@
 
+import os
 import sys
-import json
+import orjson
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import MappingProxyType
+
+# SQLite cache kept next to the script so repeat runs skip the network
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fao_cache')
+
+# (connect, read) timeout in seconds for every request, so a silent host cannot hang a run
+REQUEST_TIMEOUT = (5, 30)
+
+# Longest wait in seconds between retries, whatever the server asks for
+MAX_RETRY_WAIT = 10
+
+# URL fragments of the JSON APIs; both scrapers share the cache, so the list covers both
+JSON_SOURCES = (
+    'fenixservices.fao.org',
+    'climateknowledgeportal.worldbank.org',
+    '54.229.242.119/GSOCmap',
+    'www.fao.org/giews/earthobservation/asis/data'
+)
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Farm names mapping based on region
+FARM_NAMES = MappingProxyType({
+    "1": ("Green Valley Farm", "Sahara Oasis", "Atlas Highland"),
+    "2": ("Eastern Plains", "Highland Ranch", "Victoria Farm"),
+    "3": ("Congo Basin Farm", "Equatorial Estate", "Rainforest Plantation"),
+    "4": ("Kalahari Estate", "Cape Vineyard", "Southern Meadows"),
+    "5": ("Savanna Ranch", "Niger Delta Farm", "Coastal Plantation")
+})
+
+# Region coordinates (approximate centers)
+REGION_COORDS = MappingProxyType({
+    "1": {"lat": 30.8, "lng": 9.4},    # Northern Africa
+    "2": {"lat": 0.3, "lng": 37.9},    # Eastern Africa
+    "3": {"lat": 6.6, "lng": 20.9},    # Middle Africa
+    "4": {"lat": -26.5, "lng": 24.7},  # Southern Africa
+    "5": {"lat": 11.7, "lng": -4.3}    # Western Africa
+})
+
+# Different water usage patterns based on region
+WATER_PATTERNS = MappingProxyType({
+    "1": {"rain_base": 30, "rain_peak": 0, "irr_base": 50, "irr_peak": 6},  # Northern Africa
+    "2": {"rain_base": 60, "rain_peak": 3, "irr_base": 40, "irr_peak": 7},  # Eastern Africa
+    "3": {"rain_base": 100, "rain_peak": 7, "irr_base": 30, "irr_peak": 1}, # Middle Africa
+    "4": {"rain_base": 50, "rain_peak": 1, "irr_base": 45, "irr_peak": 7},  # Southern Africa
+    "5": {"rain_base": 80, "rain_peak": 8, "irr_base": 35, "irr_peak": 2}   # Western Africa
+})
+
+# Default risk assessment, copied per call since it is part of the output
+DEFAULT_RISK_ASSESSMENT = (
+    {
+        "type": "Drought",
+        "probability": 50,
+        "impact": 3,
+        "mitigation": "Implement water conservation practices and drought-resistant crop varieties."
+    },
+    {
+        "type": "Pest Infestation",
+        "probability": 40,
+        "impact": 3,
+        "mitigation": "Regular monitoring and integrated pest management strategies."
+    },
+    {
+        "type": "Extreme Weather",
+        "probability": 30,
+        "impact": 4,
+        "mitigation": "Weather-resistant infrastructure and crop insurance."
+    },
+    {
+        "type": "Soil Degradation",
+        "probability": 35,
+        "impact": 3,
+        "mitigation": "Implement crop rotation and cover crops to maintain soil health."
+    }
+)
+
+IRRIGATION_TYPES = ('Drip', 'Sprinkler', 'Flood', 'Center Pivot', 'Subsurface')
+
+# Different regions tend to use different irrigation methods
+REGIONAL_PREFERENCES = MappingProxyType({
+    "1": (0, 2, 4),  # Northern Africa: Drip, Flood, Subsurface
+    "2": (0, 1, 3),  # Eastern Africa: Drip, Sprinkler, Center Pivot
+    "3": (1, 2, 4),  # Middle Africa: Sprinkler, Flood, Subsurface
+    "4": (0, 1, 3),  # Southern Africa: Drip, Sprinkler, Center Pivot
+    "5": (1, 2, 3)   # Western Africa: Sprinkler, Flood, Center Pivot
+})
+
+class RateLimitRetry(Retry):
+    """Retry policy that also honours X-RateLimit-Reset when Retry-After is absent"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        reset = response.headers.get('X-RateLimit-Reset')
+        
+        if retry_after is None and reset is not None:
+            try:
+                retry_after = float(reset)
+            except ValueError:
+                return None
+            
+            # Values beyond a day are epoch timestamps rather than seconds to wait
+            if retry_after > 86400:
+                retry_after -= time.time()
+        
+        if retry_after is None:
+            return None
+        
+        return min(max(retry_after, 0), MAX_RETRY_WAIT)
+
+def is_cacheable(response):
+    """Keep HTML error pages served by the JSON APIs out of the cache"""
+    if any(source in response.url for source in JSON_SOURCES):
+        return is_json_response(response)
+    
+    return True
+
+def create_session():
+    """Create a cached keep-alive session that retries transient FAO errors"""
+    session = requests_cache.CachedSession(
+        CACHE_PATH,
+        backend='sqlite',
+        expire_after=timedelta(hours=24),
+        urls_expire_after={
+            'fenixservices.fao.org': timedelta(days=7),  # FAOSTAT annual statistics
+            'www.fao.org/giews': timedelta(hours=24),
+            'climateknowledgeportal.worldbank.org': timedelta(hours=24)
+        },
+        filter_fn=is_cacheable
+    )
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    })
+    
+    retries = RateLimitRetry(
+        total=5,
+        connect=1,  # Unreachable hosts fail fast instead of stacking connect timeouts
+        read=1,
+        backoff_factor=0.5,
+        backoff_max=MAX_RETRY_WAIT,
+        backoff_jitter=0.5,  # Spread out retries from the concurrent workers
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response back so status checks still apply
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
+
+# Shared session so repeated calls to the same host reuse one connection;
+# wrap calls in SESSION.cache_disabled() when fresh data is required
+SESSION = create_session()
+
+# Shared pool so the independent FAO requests run concurrently
+EXECUTOR = ThreadPoolExecutor(max_workers=6)
+
+def fetch_optional(url, params=None):
+    """GET an optional source, returning None instead of raising once retries are exhausted"""
+    try:
+        return SESSION.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Error fetching {url}: {str(e)}", file=sys.stderr)
+        return None
+
+def is_json_response(response):
+    """Check the headers and first byte so HTML error pages never reach the JSON parser"""
+    content_type = response.headers.get('Content-Type', '')
+    return 'html' not in content_type and response.content[:64].lstrip()[:1] in (b'{', b'[')
+
+def faostat_records(response):
+    """Return the data records of a FAOSTAT response"""
+    if not is_json_response(response):
+        return ()
+    
+    data = orjson.loads(response.content)
+    return data.get('data', ()) if isinstance(data, dict) else ()
 
 def scrape_fao_farm_data(farm_id, region_id):
     """
@@ -13,62 +195,76 @@ def scrape_fao_farm_data(farm_id, region_id):
     # FAO STAT domain for farm data
     url = "https://www.fao.org/faostat/en/#data/QCL"
     
-    # Make request to the FAO website
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    # Access the FAOSTAT API for agricultural land data
+    land_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/RL"
+    land_params = {
+        "area": region_id,
+        "element": "5110",  # Agricultural land
+        "year": "2020"      # Most recent year
     }
-    response = requests.get(url, headers=headers)
     
-    if response.status_code != 200:
-        raise Exception(f"Failed to access FAO website: {response.status_code}")
+    # Access soil data from FAO Soil Portal API
+    soil_api_url = f"http://54.229.242.119/GSOCmap/api/v1/soc/region/{region_id}"
+    
+    # Get crop production data from FAOSTAT
+    crop_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/QCL"
+    crop_params = {
+        "area": region_id,
+        "item": "15,27,44,56",  # Wheat, Rice, Barley, Maize
+        "element": "5510",      # Production
+        "year": "2020"
+    }
     
-    # Parse the HTML content
-    soup = BeautifulSoup(response.content, 'html.parser')
+    # Get water usage data from AQUASTAT
+    water_api_url = "http://www.fao.org/nr/water/aquastat/data/query/results.html"
+    water_params = {
+        "regionQuery": region_id,
+        "yearRange": "2015-2020",
+        "varGrpIds": "4250,4251,4252",  # Water withdrawal variables
+        "showCodes": "true",
+        "newestOnly": "true"
+    }
     
-    # Farm names mapping based on region
-    farm_names = {
-        "1": ["Green Valley Farm", "Sahara Oasis", "Atlas Highland"],
-        "2": ["Eastern Plains", "Highland Ranch", "Victoria Farm"],
-        "3": ["Congo Basin Farm", "Equatorial Estate", "Rainforest Plantation"],
-        "4": ["Kalahari Estate", "Cape Vineyard", "Southern Meadows"],
-        "5": ["Savanna Ranch", "Niger Delta Farm", "Coastal Plantation"]
+    # Get risk assessment data from FAO Early Warning System
+    risk_api_url = "http://www.fao.org/giews/earthobservation/asis/data/country-indicators"
+    risk_params = {
+        "code": region_id,
+        "type": "json"
     }
     
+    # The requests are independent, so fire them all before reading any response.
+    # FAOSTAT serves one domain per /data call, so the RL and QCL queries cannot be
+    # batched; running them concurrently on the shared session overlaps their latency
+    response_future = EXECUTOR.submit(SESSION.get, url, timeout=REQUEST_TIMEOUT)
+    land_future = EXECUTOR.submit(SESSION.get, land_api_url, params=land_params, timeout=REQUEST_TIMEOUT)
+    soil_future = EXECUTOR.submit(fetch_optional, soil_api_url)
+    crop_future = EXECUTOR.submit(fetch_optional, crop_api_url, params=crop_params)
+    water_future = EXECUTOR.submit(fetch_optional, water_api_url, params=water_params)
+    risk_future = EXECUTOR.submit(fetch_optional, risk_api_url, params=risk_params)
+    
+    response = response_future.result()
+    
+    if response.status_code != 200:
+        raise Exception(f"Failed to access FAO website: {response.status_code}")
+    
     # Get farm name based on region and farm ID
-    farm_list = farm_names.get(region_id, ["Unknown Farm"])
+    farm_list = FARM_NAMES.get(region_id, ("Unknown Farm",))
     farm_index = int(farm_id) % len(farm_list)
     farm_name = farm_list[farm_index]
     
-    # Region coordinates (approximate centers)
-    region_coords = {
-        "1": {"lat": 30.8, "lng": 9.4},    # Northern Africa
-        "2": {"lat": 0.3, "lng": 37.9},    # Eastern Africa
-        "3": {"lat": 6.6, "lng": 20.9},    # Middle Africa
-        "4": {"lat": -26.5, "lng": 24.7},  # Southern Africa
-        "5": {"lat": 11.7, "lng": -4.3}    # Western Africa
-    }
-    
     # Get base coordinates for the region
-    base_coords = region_coords.get(region_id, {"lat": 0, "lng": 0})
+    base_coords = REGION_COORDS.get(region_id, {"lat": 0, "lng": 0})
     
     # Add small offset to create unique farm location
     lat_offset = (int(farm_id) * 0.1) % 1.0
     lng_offset = (int(farm_id) * 0.15) % 1.5
     
-    # Access the FAOSTAT API for agricultural land data
-    land_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/RL"
-    land_params = {
-        "area": region_id,
-        "element": "5110",  # Agricultural land
-        "year": "2020"      # Most recent year
-    }
-    
-    land_response = requests.get(land_api_url, params=land_params, headers=headers)
+    land_response = land_future.result()
     
     if land_response.status_code != 200:
         raise Exception(f"Failed to access FAO land API: {land_response.status_code}")
     
-    land_data = land_response.json()
+    land_data = orjson.loads(land_response.content) if is_json_response(land_response) else {}
     
     # Calculate farm size based on regional agricultural land data
     farm_size = 100  # Default size in hectares
@@ -77,9 +273,7 @@ def scrape_fao_farm_data(farm_id, region_id):
         # Scale farm size based on regional agricultural land
         farm_size = max(50, min(1000, total_ag_land / 10000))
     
-    # Access soil data from FAO Soil Portal API
-    soil_api_url = f"http://54.229.242.119/GSOCmap/api/v1/soc/region/{region_id}"
-    soil_response = requests.get(soil_api_url, headers=headers)
+    soil_response = soil_future.result()
     
     soil_data = {
         "ph": 6.5,
@@ -90,9 +284,9 @@ def scrape_fao_farm_data(farm_id, region_id):
         "water_holding_capacity": 0.15
     }
     
-    if soil_response.status_code == 200:
+    if soil_response is not None and soil_response.status_code == 200 and is_json_response(soil_response):
         try:
-            soil_json = soil_response.json()
+            soil_json = orjson.loads(soil_response.content)
             if 'properties' in soil_json:
                 props = soil_json['properties']
                 soil_data = {
@@ -106,16 +300,7 @@ def scrape_fao_farm_data(farm_id, region_id):
         except:
             pass
     
-    # Get crop production data from FAOSTAT
-    crop_api_url = "https://fenixservices.fao.org/faostat/api/v1/en/data/QCL"
-    crop_params = {
-        "area": region_id,
-        "item": "15,27,44,56",  # Wheat, Rice, Barley, Maize
-        "element": "5510",      # Production
-        "year": "2020"
-    }
-    
-    crop_response = requests.get(crop_api_url, params=crop_params, headers=headers)
+    crop_response = crop_future.result()
     
     # Default crop distribution
     field_distribution = [
@@ -125,66 +310,45 @@ def scrape_fao_farm_data(farm_id, region_id):
         {"name": "Fallow", "value": 10}
     ]
     
-    if crop_response.status_code == 200:
-        crop_json = crop_response.json()
-        if 'data' in crop_json:
-            crops = {}
-            total = 0
-            
-            for item in crop_json['data']:
-                crop_name = item.get('item_name', '')
-                value = item.get('value', 0)
-                
-                if crop_name and value:
-                    crops[crop_name] = value
-                    total += value
+    if crop_response is not None and crop_response.status_code == 200:
+        crops = {}
+        total = 0
+        
+        for item in faostat_records(crop_response):
+            crop_name = item.get('item_name', '')
+            value = item.get('value', 0)
             
-            if total > 0:
-                field_distribution = []
-                for crop, value in crops.items():
-                    percentage = (value / total) * 70  # Scale to leave room for fallow land
-                    field_distribution.append({
-                        "name": crop,
-                        "value": round(percentage)
-                    })
-                
-                # Add fallow land
+            if crop_name and value:
+                crops[crop_name] = value
+                total += value
+        
+        if total > 0:
+            field_distribution = []
+            assigned = 0
+            for crop, value in crops.items():
+                percentage = round((value / total) * 70)  # Scale to leave room for fallow land
+                assigned += percentage
                 field_distribution.append({
-                    "name": "Fallow",
-                    "value": max(5, 100 - sum(item["value"] for item in field_distribution))
+                    "name": crop,
+                    "value": percentage
                 })
+            
+            # Add fallow land
+            field_distribution.append({
+                "name": "Fallow",
+                "value": max(5, 100 - assigned)
+            })
     
-    # Get water usage data from AQUASTAT
-    water_api_url = "http://www.fao.org/nr/water/aquastat/data/query/results.html"
-    water_params = {
-        "regionQuery": region_id,
-        "yearRange": "2015-2020",
-        "varGrpIds": "4250,4251,4252",  # Water withdrawal variables
-        "showCodes": "true",
-        "newestOnly": "true"
-    }
-    
-    water_response = requests.get(water_api_url, params=water_params, headers=headers)
+    water_response = water_future.result()
     
     # Generate water usage data based on regional patterns
-    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     water_usage = []
+    pattern = WATER_PATTERNS.get(region_id, WATER_PATTERNS["1"])
     
-    # Different water usage patterns based on region
-    patterns = {
-        "1": {"rain_base": 30, "rain_peak": 0, "irr_base": 50, "irr_peak": 6},  # Northern Africa
-        "2": {"rain_base": 60, "rain_peak": 3, "irr_base": 40, "irr_peak": 7},  # Eastern Africa
-        "3": {"rain_base": 100, "rain_peak": 7, "irr_base": 30, "irr_peak": 1}, # Middle Africa
-        "4": {"rain_base": 50, "rain_peak": 1, "irr_base": 45, "irr_peak": 7},  # Southern Africa
-        "5": {"rain_base": 80, "rain_peak": 8, "irr_base": 35, "irr_peak": 2}   # Western Africa
-    }
-    
-    pattern = patterns.get(region_id, patterns["1"])
-    
-    if water_response.status_code == 200:
+    if water_response is not None and water_response.status_code == 200 and b'dataTable' in water_response.content:
         # Try to parse real water data
-        water_soup = BeautifulSoup(water_response.content, 'html.parser')
-        water_tables = water_soup.select('table.dataTable')
+        water_tree = LexborHTMLParser(water_response.content)
+        water_tables = water_tree.css('table.dataTable')
         
         if water_tables:
             # Extract real water data if available
@@ -193,7 +357,7 @@ def scrape_fao_farm_data(farm_id, region_id):
     
     # If we couldn't get real monthly water data, create it based on regional patterns
     if not water_usage:
-        for i, month in enumerate(months):
+        for i, month in enumerate(MONTHS):
             # Calculate rainfall based on seasonal patterns
             rain_offset = abs((i - pattern["rain_peak"]) % 12)
             if rain_offset > 6:
@@ -216,46 +380,14 @@ def scrape_fao_farm_data(farm_id, region_id):
                 "efficiency": round(efficiency)
             })
     
-    # Get risk assessment data from FAO Early Warning System
-    risk_api_url = "http://www.fao.org/giews/earthobservation/asis/data/country-indicators"
-    risk_params = {
-        "code": region_id,
-        "type": "json"
-    }
-    
-    risk_response = requests.get(risk_api_url, params=risk_params, headers=headers)
+    risk_response = risk_future.result()
     
     # Default risk assessment
-    risk_assessment = [
-        {
-            "type": "Drought",
-            "probability": 50,
-            "impact": 3,
-            "mitigation": "Implement water conservation practices and drought-resistant crop varieties."
-        },
-        {
-            "type": "Pest Infestation",
-            "probability": 40,
-            "impact": 3,
-            "mitigation": "Regular monitoring and integrated pest management strategies."
-        },
-        {
-            "type": "Extreme Weather",
-            "probability": 30,
-            "impact": 4,
-            "mitigation": "Weather-resistant infrastructure and crop insurance."
-        },
-        {
-            "type": "Soil Degradation",
-            "probability": 35,
-            "impact": 3,
-            "mitigation": "Implement crop rotation and cover crops to maintain soil health."
-        }
-    ]
+    risk_assessment = [dict(risk) for risk in DEFAULT_RISK_ASSESSMENT]
     
-    if risk_response.status_code == 200:
+    if risk_response is not None and risk_response.status_code == 200 and is_json_response(risk_response):
         try:
-            risk_json = risk_response.json()
+            risk_json = orjson.loads(risk_response.content)
             if 'indicators' in risk_json:
                 # Parse real risk data
                 # Implementation would depend on the actual structure of the API response
@@ -288,8 +420,6 @@ def scrape_fao_farm_data(farm_id, region_id):
 
 def get_soil_type(ph, organic_matter):
     """Determine soil type based on pH and organic matter"""
-    soil_types = ['Clay Loam', 'Sandy Loam', 'Silt Loam', 'Loamy Sand', 'Silty Clay']
-    
     if ph < 5.5:
         return 'Sandy Loam' if organic_matter < 3 else 'Loamy Sand'
     elif ph < 6.5:
@@ -299,21 +429,10 @@ def get_soil_type(ph, organic_matter):
 
 def get_irrigation_type(region_id, farm_id):
     """Determine irrigation type based on region and farm ID"""
-    irrigation_types = ['Drip', 'Sprinkler', 'Flood', 'Center Pivot', 'Subsurface']
-    
-    # Different regions tend to use different irrigation methods
-    regional_preferences = {
-        "1": [0, 2, 4],  # Northern Africa: Drip, Flood, Subsurface
-        "2": [0, 1, 3],  # Eastern Africa: Drip, Sprinkler, Center Pivot
-        "3": [1, 2, 4],  # Middle Africa: Sprinkler, Flood, Subsurface
-        "4": [0, 1, 3],  # Southern Africa: Drip, Sprinkler, Center Pivot
-        "5": [1, 2, 3]   # Western Africa: Sprinkler, Flood, Center Pivot
-    }
-    
-    preferences = regional_preferences.get(region_id, [0, 1, 2])
+    preferences = REGIONAL_PREFERENCES.get(region_id, (0, 1, 2))
     index = int(farm_id) % len(preferences)
     
-    return irrigation_types[preferences[index]]
+    return IRRIGATION_TYPES[preferences[index]]
 
 # Main execution
 if __name__ == "__main__":
@@ -326,7 +445,7 @@ if __name__ == "__main__":
     
     try:
         result = scrape_fao_farm_data(farm_id, region_id)
-        print(json.dumps(result))
+        sys.stdout.buffer.write(orjson.dumps(result) + b"\n")
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        sys.stdout.buffer.write(orjson.dumps({"error": str(e)}) + b"\n")
         sys.exit(1)